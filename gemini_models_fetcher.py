@@ -5,10 +5,365 @@
 """
 
 import os
-import requests
-from typing import List, Dict, Optional
+import re
+import sys
+import json
+import argparse
+import tempfile
+import zlib
+from bisect import bisect_left
+from typing import List, Dict, Optional, Set
 from datetime import datetime
 
+# 本地模型缓存的默认路径，可通过GEMINI_MODELS_CACHE环境变量覆盖
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser('~'), '.cache', 'gemini-models-fetcher', 'models.json'
+)
+
+# 分词: 保留版本号中的点，例如 "gemini-2.5-flash" -> ["gemini", "2.5", "flash"]
+_TOKEN_RE = re.compile(r'\w+(?:\.\w+)*')
+
+
+def _tokenize(text: str) -> List[str]:
+    """将文本转为小写并切分为token"""
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def _trigrams(text: str) -> Set[str]:
+    """生成用于模糊匹配的三元组集合"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ModelSearchIndex:
+    """
+    模型搜索索引
+
+    每次获取模型列表时构建一次，并随本地缓存一起保存，查询时无需重建：
+    - 有序前缀表: 索引模型名称、别名(去掉"models/"前缀的ID、显示名称)及其token，用二分查找做前缀匹配
+    - 倒排索引: 索引描述中的token
+    - 三元组索引: 当精确/前缀匹配无结果时用于模糊匹配
+
+    所有结构都只由字典、列表和字符串组成，可直接序列化为JSON
+    """
+
+    # 索引格式版本，结构变化时递增，使旧缓存中的索引失效
+    VERSION = 2
+
+    # 各类匹配的得分权重
+    EXACT_ALIAS_SCORE = 100
+    PREFIX_ALIAS_SCORE = 50
+    EXACT_NAME_TOKEN_SCORE = 15
+    PREFIX_NAME_TOKEN_SCORE = 10
+    DESCRIPTION_TOKEN_SCORE = 3
+    DESCRIPTION_PREFIX_SCORE = 1
+    COVERAGE_SCORE = 20
+    FUZZY_THRESHOLD = 0.3
+
+    def __init__(self, models: List[Dict], index_data: Optional[Dict] = None):
+        """
+        构建搜索索引
+
+        Args:
+            models: 模型列表
+            index_data: to_dict()导出的预构建索引，提供时直接使用而不重新构建
+        """
+        self.models = list(models)
+
+        if index_data is None:
+            index_data = self._build(self.models)
+
+        self._keys: List[str] = index_data['keys']
+        self._key_docs: List[List[int]] = index_data['key_docs']
+        self._aliases: List[str] = index_data['aliases']
+        self._alias_docs: List[List[int]] = index_data['alias_docs']
+        self._name_tokens: Dict[str, List[int]] = index_data['name_tokens']
+        self._description_vocab: List[str] = index_data['description_vocab']
+        self._description_docs: List[List[int]] = index_data['description_docs']
+        self._trigram_index: Dict[str, List[int]] = index_data['trigrams']
+        self._doc_alias_tokens: List[List[List[str]]] = index_data['doc_alias_tokens']
+
+    @classmethod
+    def _build(cls, models: List[Dict]) -> Dict:
+        """从模型列表构建索引数据"""
+        keys: Dict[str, Set[int]] = {}
+        aliases: Dict[str, Set[int]] = {}
+        name_tokens: Dict[str, Set[int]] = {}
+        description_index: Dict[str, Set[int]] = {}
+        trigram_index: Dict[str, Set[str]] = {}
+        doc_alias_tokens: List[List[List[str]]] = []
+
+        for doc_id, model in enumerate(models):
+            model_aliases = sorted(cls._model_aliases(model))
+            doc_alias_tokens.append([_tokenize(alias) for alias in model_aliases])
+            for alias in model_aliases:
+                aliases.setdefault(alias, set()).add(doc_id)
+                keys.setdefault(alias, set()).add(doc_id)
+                for gram in _trigrams(alias):
+                    trigram_index.setdefault(gram, set()).add(alias)
+                for token in _tokenize(alias):
+                    name_tokens.setdefault(token, set()).add(doc_id)
+                    keys.setdefault(token, set()).add(doc_id)
+
+            for token in _tokenize(model.get('description', '')):
+                description_index.setdefault(token, set()).add(doc_id)
+
+        sorted_keys = sorted(keys)
+        sorted_aliases = sorted(aliases)
+        alias_positions = {alias: i for i, alias in enumerate(sorted_aliases)}
+        description_vocab = sorted(description_index)
+        return {
+            'version': cls.VERSION,
+            'total_models': len(models),
+            'fingerprint': cls._fingerprint(models),
+            'keys': sorted_keys,
+            'key_docs': [sorted(keys[key]) for key in sorted_keys],
+            'aliases': sorted_aliases,
+            'alias_docs': [sorted(aliases[alias]) for alias in sorted_aliases],
+            'name_tokens': {token: sorted(ids) for token, ids in name_tokens.items()},
+            'description_vocab': description_vocab,
+            'description_docs': [sorted(description_index[token]) for token in description_vocab],
+            # 三元组只记录别名在aliases中的位置，避免在缓存中重复存储别名字符串
+            'trigrams': {
+                gram: sorted(alias_positions[alias] for alias in names)
+                for gram, names in trigram_index.items()
+            },
+            # 每个模型各别名的token，用于计算查询对名称的覆盖率
+            'doc_alias_tokens': doc_alias_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, models: List[Dict], index_data) -> 'ModelSearchIndex':
+        """
+        从to_dict()导出的数据恢复索引
+
+        索引版本、模型指纹不匹配或各列表长度不一致(缓存损坏)时重新构建
+
+        Args:
+            models: 模型列表
+            index_data: 预构建的索引数据
+
+        Returns:
+            ModelSearchIndex实例
+        """
+        if (not isinstance(index_data, dict)
+                or index_data.get('version') != cls.VERSION
+                or index_data.get('total_models') != len(models)
+                or index_data.get('fingerprint') != cls._fingerprint(models)):
+            return cls(models)
+
+        try:
+            index = cls(models, index_data)
+        except KeyError:
+            return cls(models)
+
+        if not index._is_consistent():
+            return cls(models)
+        return index
+
+    @staticmethod
+    def _fingerprint(models: List[Dict]) -> int:
+        """根据参与索引的字段计算模型列表的CRC32指纹，用于判断缓存中的索引是否过期"""
+        fields = '\0'.join(
+            str(model.get(field) or '')
+            for model in models
+            for field in ('name', 'display_name', 'displayName', 'description')
+        )
+        return zlib.crc32(fields.encode('utf-8'))
+
+    def _is_consistent(self) -> bool:
+        """检查恢复的索引中各有序词表与其对应的文档列表长度一致，且每个模型都有别名token"""
+        return all(
+            isinstance(vocab, list) and isinstance(postings, list) and len(vocab) == len(postings)
+            for vocab, postings in (
+                (self._keys, self._key_docs),
+                (self._aliases, self._alias_docs),
+                (self._description_vocab, self._description_docs),
+            )
+        ) and (
+            isinstance(self._name_tokens, dict)
+            and isinstance(self._trigram_index, dict)
+            and isinstance(self._doc_alias_tokens, list)
+            and len(self._doc_alias_tokens) == len(self.models)
+        )
+
+    def to_dict(self) -> Dict:
+        """导出可JSON序列化的索引数据"""
+        return {
+            'version': self.VERSION,
+            'total_models': len(self.models),
+            'fingerprint': self._fingerprint(self.models),
+            'keys': self._keys,
+            'key_docs': self._key_docs,
+            'aliases': self._aliases,
+            'alias_docs': self._alias_docs,
+            'name_tokens': self._name_tokens,
+            'description_vocab': self._description_vocab,
+            'description_docs': self._description_docs,
+            'trigrams': self._trigram_index,
+            'doc_alias_tokens': self._doc_alias_tokens,
+        }
+
+    @staticmethod
+    def _model_aliases(model: Dict) -> Set[str]:
+        """获取模型的所有别名(小写)"""
+        name = (model.get('name') or '').lower()
+        display_name = (model.get('display_name') or model.get('displayName') or '').lower()
+
+        aliases = {name, display_name}
+        if name.startswith('models/'):
+            aliases.add(name[len('models/'):])
+        aliases.discard('')
+        return aliases
+
+    @staticmethod
+    def _range_lookup(vocab: List[str], postings: List[List[int]], prefix: str) -> Set[int]:
+        """在有序词表中二分查找所有以prefix开头的词，返回对应的文档ID"""
+        doc_ids: Set[int] = set()
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix):
+            doc_ids.update(postings[i])
+            i += 1
+        return doc_ids
+
+    def _prefix_lookup(self, prefix: str) -> Set[int]:
+        """返回名称、别名或名称token以prefix开头的文档ID"""
+        return self._range_lookup(self._keys, self._key_docs, prefix)
+
+    @staticmethod
+    def _exact_lookup(vocab: List[str], postings: List[List[int]], key: str) -> List[int]:
+        """在有序词表中二分查找key，返回对应的文档ID"""
+        i = bisect_left(vocab, key)
+        if i < len(vocab) and vocab[i] == key:
+            return postings[i]
+        return []
+
+    def _score_token(self, token: str, is_last: bool) -> Dict[int, float]:
+        """
+        计算单个查询词对各模型的得分
+
+        命中名称的模型只计名称得分，描述得分只给仅在描述中命中的模型，
+        避免描述中的重复词让名称匹配较差的模型排在前面
+
+        Args:
+            token: 查询词
+            is_last: 是否为最后一个查询词(可能尚未输完，额外对描述做前缀匹配)
+
+        Returns:
+            文档ID到得分的映射，只包含命中的模型
+        """
+        name_scores: Dict[int, float] = {}
+        for doc_id in self._prefix_lookup(token):
+            name_scores[doc_id] = self.PREFIX_NAME_TOKEN_SCORE
+        for doc_id in self._name_tokens.get(token, ()):
+            name_scores[doc_id] = self.EXACT_NAME_TOKEN_SCORE
+
+        description_scores: Dict[int, float] = {}
+        if is_last:
+            for doc_id in self._range_lookup(self._description_vocab, self._description_docs, token):
+                description_scores[doc_id] = self.DESCRIPTION_PREFIX_SCORE
+        for doc_id in self._exact_lookup(self._description_vocab, self._description_docs, token):
+            description_scores[doc_id] = description_scores.get(doc_id, 0) + self.DESCRIPTION_TOKEN_SCORE
+
+        description_scores.update(name_scores)
+        return description_scores
+
+    def _coverage(self, doc_id: int, tokens: tuple) -> float:
+        """
+        计算查询对模型名称的覆盖率
+
+        取模型各别名中被查询词(作为前缀)覆盖的token占比的最大值，
+        例如 "2.5 flash" 覆盖 "gemini-2.5-flash" 的2/3，而只覆盖 "gemini-2.5-flash-lite" 的2/4
+
+        Args:
+            doc_id: 模型在索引中的位置
+            tokens: 查询词元组(直接传给str.startswith)
+
+        Returns:
+            0到1之间的覆盖率
+        """
+        best = 0.0
+        for alias_tokens in self._doc_alias_tokens[doc_id]:
+            if not alias_tokens:
+                continue
+            covered = len([alias_token for alias_token in alias_tokens if alias_token.startswith(tokens)])
+            best = max(best, covered / len(alias_tokens))
+        return best
+
+    def _fuzzy_search(self, query: str) -> Dict[int, float]:
+        """
+        基于三元组的模糊匹配
+
+        命中的查询三元组占比达到阈值才算匹配，排序则使用Jaccard相似度，使更短、更接近查询的别名排在前面
+        """
+        query_grams = _trigrams(query)
+        overlap: Dict[int, int] = {}
+        for gram in query_grams:
+            for alias_id in self._trigram_index.get(gram, ()):
+                overlap[alias_id] = overlap.get(alias_id, 0) + 1
+
+        scores: Dict[int, float] = {}
+        for alias_id, shared in overlap.items():
+            if shared / len(query_grams) < self.FUZZY_THRESHOLD:
+                continue
+            alias_grams = _trigrams(self._aliases[alias_id])
+            similarity = shared / len(query_grams | alias_grams)
+            for doc_id in self._alias_docs[alias_id]:
+                scores[doc_id] = max(scores.get(doc_id, 0), similarity * 10)
+        return scores
+
+    def search(self, query: str, limit: Optional[int] = 10) -> List[Dict]:
+        """
+        搜索模型
+
+        所有查询词都需要命中名称或描述；若无结果则退回模糊匹配
+
+        Args:
+            query: 查询字符串
+            limit: 最多返回的结果数(至少为1)，None表示不限制
+
+        Returns:
+            按相关度排序的模型列表
+        """
+        if limit is not None and limit < 1:
+            raise ValueError("limit必须大于等于1")
+
+        query = query.strip().lower()
+        tokens = _tokenize(query)
+        if not tokens:
+            return []
+
+        exact_alias_hits = set(self._exact_lookup(self._aliases, self._alias_docs, query))
+        scores: Dict[int, float] = {}
+        for doc_id in exact_alias_hits:
+            scores[doc_id] = scores.get(doc_id, 0) + self.EXACT_ALIAS_SCORE
+        for doc_id in self._prefix_lookup(query):
+            scores[doc_id] = scores.get(doc_id, 0) + self.PREFIX_ALIAS_SCORE
+
+        matched: Optional[Set[int]] = None
+        for position, token in enumerate(tokens):
+            token_scores = self._score_token(token, is_last=position == len(tokens) - 1)
+            matched = set(token_scores) if matched is None else matched & set(token_scores)
+            for doc_id, score in token_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0) + score
+
+        candidates = (matched or set()) | exact_alias_hits
+        token_prefixes = tuple(tokens)
+        ranked = {
+            doc_id: scores[doc_id] + self.COVERAGE_SCORE * self._coverage(doc_id, token_prefixes)
+            for doc_id in candidates
+        }
+        if not ranked:
+            ranked = self._fuzzy_search(query)
+
+        # 同分时按模型名称倒序，与filter_latest_models一致，较新的版本在前
+        results = sorted(ranked, key=lambda doc_id: self.models[doc_id].get('name') or '', reverse=True)
+        results.sort(key=lambda doc_id: -ranked[doc_id])
+        if limit is not None:
+            results = results[:limit]
+        return [self.models[doc_id] for doc_id in results]
+
+
 class GeminiModelsFetcher:
     """获取Google Gemini模型列表的类"""
     
@@ -31,7 +386,10 @@ class GeminiModelsFetcher:
         """
         if not self.api_key:
             raise ValueError("需要提供API密钥。请设置GOOGLE_AI_API_KEY环境变量或传入api_key参数")
-            
+
+        # 延迟导入，search子命令等不需要网络的路径无需加载requests
+        import requests
+
         headers = {
             'Content-Type': 'application/json',
         }
@@ -185,8 +543,141 @@ class GeminiModelsFetcher:
             print(f"   输出token限制: {output_limit}")
             print("-" * 80)
 
-def main():
+    def save_models_cache(self, models: List[Dict], path: Optional[str] = None):
+        """
+        将模型列表及其预构建的搜索索引保存到本地缓存
+
+        先写入同目录下的临时文件再替换缓存文件，避免同时运行的search读到写了一半的缓存
+
+        Args:
+            models: 模型列表
+            path: 缓存文件路径，默认使用GEMINI_MODELS_CACHE环境变量或DEFAULT_CACHE_PATH
+        """
+        path = path or os.getenv('GEMINI_MODELS_CACHE', DEFAULT_CACHE_PATH)
+        data = {
+            "timestamp": datetime.now().isoformat(),
+            "total_models": len(models),
+            "models": models,
+            "search_index": self.build_search_index(models).to_dict()
+        }
+
+        directory = os.path.dirname(path) or '.'
+        tmp_path = None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.models-', suffix='.tmp')
+            # mkstemp创建的文件权限为0600，改为与普通open()创建的文件一致
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"保存模型缓存失败: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def load_models_cache(self, path: Optional[str] = None) -> List[Dict]:
+        """
+        从本地缓存加载模型列表
+
+        Args:
+            path: 缓存文件路径，默认使用GEMINI_MODELS_CACHE环境变量或DEFAULT_CACHE_PATH
+
+        Returns:
+            包含模型信息的字典列表
+        """
+        data = self._read_models_cache(path)
+        return data['models'] if data else []
+
+    def load_search_index(self, path: Optional[str] = None) -> Optional[ModelSearchIndex]:
+        """
+        从本地缓存加载搜索索引
+
+        优先使用缓存中预构建的索引，缺失或版本不匹配时根据缓存的模型列表重新构建
+
+        Args:
+            path: 缓存文件路径，默认使用GEMINI_MODELS_CACHE环境变量或DEFAULT_CACHE_PATH
+
+        Returns:
+            ModelSearchIndex实例，缓存不存在或为空时返回None
+        """
+        data = self._read_models_cache(path)
+        if not data or not data['models']:
+            return None
+        return ModelSearchIndex.from_dict(data['models'], data.get('search_index'))
+
+    def _read_models_cache(self, path: Optional[str] = None) -> Optional[Dict]:
+        """读取并校验缓存文件，文件不存在或格式无效时返回None"""
+        path = path or os.getenv('GEMINI_MODELS_CACHE', DEFAULT_CACHE_PATH)
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"读取模型缓存失败: {e}", file=sys.stderr)
+            return None
+
+        models = data.get('models') if isinstance(data, dict) else None
+        if not isinstance(models, list) or not all(isinstance(model, dict) for model in models):
+            print("读取模型缓存失败: 缓存格式无效", file=sys.stderr)
+            return None
+
+        return data
+
+    def build_search_index(self, models: List[Dict]) -> ModelSearchIndex:
+        """
+        为模型列表构建搜索索引
+
+        Args:
+            models: 模型列表
+
+        Returns:
+            ModelSearchIndex实例
+        """
+        return ModelSearchIndex(models)
+
+
+def search_command(query: str, limit: int = 10, cache_path: Optional[str] = None):
+    """在本地缓存中搜索模型，每行输出一个模型名称；缓存不存在、为空或无效时以状态码1退出"""
+    index = GeminiModelsFetcher().load_search_index(cache_path)
+
+    if index is None:
+        print("本地模型缓存不存在、为空或无效，请先运行 gemini-models-fetcher 获取模型列表", file=sys.stderr)
+        sys.exit(1)
+
+    for model in index.search(query, limit=limit):
+        print(model.get('name'))
+
+
+def _positive_int(value: str) -> int:
+    """argparse类型: 大于等于1的整数"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"无效的整数: {value}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"必须大于等于1: {value}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None):
     """主函数"""
+    parser = argparse.ArgumentParser(prog='gemini-models-fetcher', description='获取Google Gemini最新模型列表')
+    subparsers = parser.add_subparsers(dest='command')
+    search_parser = subparsers.add_parser('search', help='在本地缓存中搜索模型')
+    search_parser.add_argument('query', nargs='+', help='查询字符串')
+    search_parser.add_argument('-n', '--limit', type=_positive_int, default=10, help='最多返回的结果数 (默认: 10)')
+    search_parser.add_argument('--cache', help='缓存文件路径')
+    args = parser.parse_args(argv)
+
+    if args.command == 'search':
+        search_command(' '.join(args.query), limit=args.limit, cache_path=args.cache)
+        return
+
     # 设置API密钥 (需要从Google AI Studio获取)
     api_key = os.getenv('GOOGLE_AI_API_KEY')
     
@@ -217,6 +708,9 @@ def main():
         models = fetcher.get_models_via_rest_api()
     
     if models:
+        # 保存到本地缓存，供search子命令使用
+        fetcher.save_models_cache(models)
+
         # 过滤最新模型
         latest_models = fetcher.filter_latest_models(models)
         
@@ -258,9 +752,15 @@ pip install google-genai google-generativeai requests
 # 3. 运行脚本
 python gemini_models_fetcher.py
 
+# 4. 在本地缓存中搜索模型
+python gemini_models_fetcher.py search flash
+
 # 或者直接在代码中使用：
 fetcher = GeminiModelsFetcher("your_api_key")
 models = fetcher.get_models_via_new_sdk()
 latest = fetcher.filter_latest_models(models)
 fetcher.print_models_info(latest)
+
+index = fetcher.build_search_index(models)
+results = index.search("2.5 pro")
 """
\ No newline at end of file